@@ -0,0 +1,33 @@
+"""
+Archive old rephrase history.
+
+Moves rows older than HISTORY_RETENTION_DAYS out of `rephrase_history` into
+gzip JSONL files under HISTORY_ARCHIVE_DIR. Run on a schedule:
+
+    python -m app.archive [--days 365] [--archive-dir ./archive]
+"""
+import argparse
+from .config import settings
+from .database import SessionLocal
+from .services.history_service import history_service, ARCHIVE_BATCH_SIZE
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old rephrase history")
+    parser.add_argument("--days", type=int, default=settings.HISTORY_RETENTION_DAYS)
+    parser.add_argument("--archive-dir", default=settings.HISTORY_ARCHIVE_DIR)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    if args.days < 0:
+        parser.error("--days must not be negative")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+
+    db = SessionLocal()
+    try:
+        archived = history_service.archive_older_than(db, args.days, args.archive_dir, args.batch_size)
+    finally:
+        db.close()
+    print(f"Archived {archived} history rows older than {args.days} days to {args.archive_dir}")
+
+if __name__ == "__main__":
+    main()
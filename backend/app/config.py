@@ -10,5 +10,13 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRATION_MINUTES: int = int(os.getenv("JWT_EXPIRATION_MINUTES", "1440"))
+    # Set to "false" in production and run `python -m app.migrate` as a release step
+    AUTO_CREATE_SCHEMA: bool = os.getenv("AUTO_CREATE_SCHEMA", "true").lower() == "true"
+    HISTORY_RETENTION_DAYS: int = int(os.getenv("HISTORY_RETENTION_DAYS", "365"))
+    HISTORY_ARCHIVE_DIR: str = os.getenv("HISTORY_ARCHIVE_DIR", "./archive")
+    BULK_REGISTER_MAX_BYTES: int = int(os.getenv("BULK_REGISTER_MAX_BYTES", str(10 * 1024 * 1024)))
+    BULK_REGISTER_MAX_ROWS: int = int(os.getenv("BULK_REGISTER_MAX_ROWS", "5000"))
+    # Comma-separated user ids allowed to read cross-user analytics
+    ADMIN_USER_IDS: set = {int(i) for i in os.getenv("ADMIN_USER_IDS", "").split(",") if i.strip()}
     
 settings = Settings()
@@ -1,17 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect, text
+from .config import settings
 from .database import Base, engine
-from .routers import users, tags, rephrase
+from .migrate import create_schema
+from .routers import users, tags, rephrase, analytics
+from .services.ai_service import ai_service
+from .utils.middleware import AuthContextMiddleware
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+def warm_up() -> bool:
+    """Check the database and its schema, then initialize the AI client"""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            missing = set(Base.metadata.tables) - set(inspect(connection).get_table_names())
+        if missing:
+            # With AUTO_CREATE_SCHEMA=false this means `python -m app.migrate` has not run
+            raise RuntimeError(f"missing tables: {', '.join(sorted(missing))}")
+        ai_service.warm_up()
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        return False
+    app.state.ready = True
+    return True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    if settings.AUTO_CREATE_SCHEMA:
+        create_schema()
+    # Warm up in the background so the server starts accepting requests immediately
+    warm_up_task = asyncio.create_task(run_in_threadpool(warm_up))
+    yield
+    warm_up_task.cancel()
 
 app = FastAPI(
     title="SenseAble API",
     description="AI-powered accessibility tool for text rephrasing",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Verify bearer tokens once per request (added first so CORS wraps its 401s)
+app.add_middleware(AuthContextMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +61,7 @@ app.add_middleware(
 app.include_router(users.router)
 app.include_router(tags.router)
 app.include_router(rephrase.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 def root():
@@ -37,3 +74,10 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 200 once the database schema exists and the AI client is warm"""
+    if not getattr(app.state, "ready", False) and not warm_up():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
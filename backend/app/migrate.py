@@ -0,0 +1,23 @@
+"""
+Create the database schema.
+
+Run as an explicit release step (`python -m app.migrate`) when the app is
+started with AUTO_CREATE_SCHEMA=false.
+"""
+from .database import Base, engine
+from .models import user, preference, tag, rephrase, analytics  # noqa: F401 - register tables
+
+# Indexes added after their tables first shipped. create_all skips tables
+# that already exist, so these are created on their own.
+ADDED_INDEXES = {"idx_rephrase_history_created_at"}
+
+def create_schema() -> None:
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.name in ADDED_INDEXES:
+                index.create(bind=engine, checkfirst=True)
+
+if __name__ == "__main__":
+    create_schema()
+    print("Database schema is up to date")
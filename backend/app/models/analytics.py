@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Date, UniqueConstraint
+from ..database import Base
+
+class AnalyticsRollup(Base):
+    """Per-day counter, updated in the same transaction as the write it counts"""
+    __tablename__ = "analytics_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "metric", "dimension", name="uq_analytics_rollups_day_metric_dimension"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    metric = Column(String(50), nullable=False)
+    dimension = Column(String(255), nullable=False, default="")
+    value = Column(Integer, nullable=False, default=0)
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from ..database import Base
 
 class RephraseHistory(Base):
     __tablename__ = "rephrase_history"
+    __table_args__ = (
+        Index("idx_rephrase_history_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
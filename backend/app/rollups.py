@@ -0,0 +1,18 @@
+"""
+Rebuild analytics rollups from the primary tables.
+
+Rollups are maintained on write; run this once after deploying them to an
+existing database, or to correct drift:
+
+    python -m app.rollups
+"""
+from .database import SessionLocal
+from .services.analytics_service import analytics_service
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        analytics_service.rebuild(db)
+    finally:
+        db.close()
+    print("Analytics rollups rebuilt")
@@ -0,0 +1,29 @@
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..database import get_db
+from ..schemas.analytics import AnalyticsResponse
+from ..services.analytics_service import analytics_service
+from ..utils.responses import json_response
+from ..utils.dependencies import get_admin_user_id
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+@router.get("", response_model=AnalyticsResponse, dependencies=[Depends(get_admin_user_id)])
+def get_analytics(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    top: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Usage and accessibility analytics, read from the daily rollups (default: last 30 days).
+    Admin only; per-user activity is limited to the `top` most active users.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return json_response(AnalyticsResponse, analytics_service.get_summary(db, start, end, top))
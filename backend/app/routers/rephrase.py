@@ -1,21 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, WebSocketException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..database import get_db
-from ..schemas.rephrase import RephraseRequest, RephraseResponse, RephraseHistoryResponse
+from ..schemas.rephrase import RephraseRequest, RephraseResponse, RephraseHistoryResponse, RefinementMessage
 from ..models.rephrase import RephraseHistory
 from ..services.ai_service import ai_service
 from ..services.user_service import user_service
 from ..services.tag_service import tag_service
+from ..services.refinement_service import refinement_service
+from ..services.history_service import history_service
+from ..services.analytics_service import analytics_service
+from ..utils.responses import json_response, json_list_response
+from ..utils.dependencies import RequestContext, get_request_context, get_current_user_id
 
 router = APIRouter(prefix="/api/rephrase", tags=["rephrase"])
 
 @router.post("", response_model=RephraseResponse)
-def rephrase_text(request: RephraseRequest, db: Session = Depends(get_db)):
+def rephrase_text(
+    request: RephraseRequest,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Rephrase text based on user preferences"""
     # Get user preferences
-    user = user_service.get_user_by_id(db, request.user_id)
+    user = context.get_user(db, request.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -45,19 +57,26 @@ def rephrase_text(request: RephraseRequest, db: Session = Depends(get_db)):
         version=1
     )
     db.add(history)
+    analytics_service.record_rephrase(
+        db, request.user_id, preferences.accessibility_need if preferences else None, regenerate=False
+    )
     db.commit()
     
-    return RephraseResponse(
-        rephrased_text=result["rephrased_text"],
-        suggestions=result["suggestions"],
-        version=1
-    )
+    return json_response(RephraseResponse, {
+        "rephrased_text": result["rephrased_text"],
+        "suggestions": result["suggestions"],
+        "version": 1
+    })
 
 @router.post("/regenerate", response_model=RephraseResponse)
-def regenerate_rephrase(request: RephraseRequest, db: Session = Depends(get_db)):
+def regenerate_rephrase(
+    request: RephraseRequest,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Regenerate a new version of rephrased text"""
     # Get user preferences
-    user = user_service.get_user_by_id(db, request.user_id)
+    user = context.get_user(db, request.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -95,19 +114,102 @@ def regenerate_rephrase(request: RephraseRequest, db: Session = Depends(get_db))
         version=new_version
     )
     db.add(history)
+    analytics_service.record_rephrase(
+        db, request.user_id, preferences.accessibility_need if preferences else None, regenerate=True
+    )
     db.commit()
     
-    return RephraseResponse(
-        rephrased_text=result["rephrased_text"],
-        suggestions=result["suggestions"],
-        version=new_version
-    )
+    return json_response(RephraseResponse, {
+        "rephrased_text": result["rephrased_text"],
+        "suggestions": result["suggestions"],
+        "version": new_version
+    })
 
 @router.get("/history/{user_id}", response_model=List[RephraseHistoryResponse])
-def get_rephrase_history(user_id: int, db: Session = Depends(get_db)):
+def get_rephrase_history(
+    user_id: int,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Get rephrase history for a user"""
+    context.authorize(user_id)
     history = db.query(RephraseHistory).filter(
         RephraseHistory.user_id == user_id
     ).order_by(RephraseHistory.created_at.desc()).limit(50).all()
     
-    return [RephraseHistoryResponse.model_validate(h) for h in history]
+    return json_list_response(RephraseHistoryResponse, history)
+
+@router.get("/history/{user_id}/export", dependencies=[Depends(get_current_user_id)])
+def export_rephrase_history(
+    user_id: int,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
+    """Download your full rephrase history as gzip-compressed JSON lines (requires a bearer token)"""
+    if not context.get_user(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return StreamingResponse(
+        history_service.export_jsonl_gz(user_id),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="rephrase_history_{user_id}.jsonl.gz"'}
+    )
+
+@router.websocket("/session/{user_id}")
+async def refinement_session(
+    websocket: WebSocket,
+    user_id: int,
+    context: RequestContext = Depends(get_request_context)
+):
+    """
+    Iterative refinement over a websocket.
+
+    The document, user context and version counter stay on the server, so
+    clients send small messages (rephrase, regenerate, accept, ignore, edit)
+    and receive only the changed spans back.
+    """
+    if context.user_id is not None and context.user_id != user_id:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not allowed to access this user")
+
+    session = await run_in_threadpool(refinement_service.open_session, user_id)
+    if not session:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
+
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                message = RefinementMessage.model_validate(await websocket.receive_json())
+            except (ValidationError, ValueError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+
+            if message.type == "rephrase":
+                if message.text is None:
+                    await websocket.send_json({"type": "error", "detail": "text is required"})
+                    continue
+                session.set_text(message.text)
+                reply = await run_in_threadpool(session.rephrase, False)
+            elif message.type == "regenerate":
+                if not session.text:
+                    await websocket.send_json({"type": "error", "detail": "Nothing to regenerate"})
+                    continue
+                reply = await run_in_threadpool(session.rephrase, True)
+            elif message.type == "accept":
+                if message.phrase is None or message.replacement is None:
+                    await websocket.send_json({"type": "error", "detail": "phrase and replacement are required"})
+                    continue
+                reply = session.accept(message.phrase, message.replacement)
+            elif message.type == "ignore":
+                if message.phrase is None:
+                    await websocket.send_json({"type": "error", "detail": "phrase is required"})
+                    continue
+                reply = session.ignore(message.phrase)
+            else:
+                if message.start is None or message.end is None or message.text is None:
+                    await websocket.send_json({"type": "error", "detail": "start, end and text are required"})
+                    continue
+                reply = session.edit(message.start, message.end, message.text)
+
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
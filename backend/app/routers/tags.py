@@ -6,33 +6,52 @@ from ..database import get_db
 from ..schemas.tag import TagCreate, TagUpdate, TagResponse
 from ..schemas.rephrase import Suggestion
 from ..services.tag_service import tag_service
+from ..utils.responses import json_response, json_stream_response
+from ..utils.dependencies import RequestContext, get_request_context
 
 router = APIRouter(prefix="/api/tags", tags=["tags"])
 
 @router.post("", response_model=TagResponse)
-def create_tag(tag_data: TagCreate, db: Session = Depends(get_db)):
+def create_tag(
+    tag_data: TagCreate,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Create a new tag"""
+    context.authorize(tag_data.user_id)
     tag = tag_service.create_tag(db, tag_data)
-    return TagResponse.model_validate(tag)
+    return json_response(TagResponse, tag)
 
 @router.get("/{user_id}", response_model=List[TagResponse])
-def get_tags(user_id: int, db: Session = Depends(get_db)):
-    """Get all tags for a user"""
-    tags = tag_service.get_tags_by_user(db, user_id)
-    return [TagResponse.model_validate(tag) for tag in tags]
+def get_tags(
+    user_id: int,
+    context: RequestContext = Depends(get_request_context)
+):
+    """Get all tags for a user, streamed in chunks"""
+    context.authorize(user_id)
+    return json_stream_response(TagResponse, tag_service.iter_tags_by_user(user_id))
 
 @router.put("/{tag_id}", response_model=TagResponse)
-def update_tag(tag_id: int, tag_data: TagUpdate, db: Session = Depends(get_db)):
+def update_tag(
+    tag_id: int,
+    tag_data: TagUpdate,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Update a tag"""
-    tag = tag_service.update_tag(db, tag_id, tag_data)
+    tag = tag_service.update_tag(db, tag_id, tag_data, user_id=context.user_id)
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
-    return TagResponse.model_validate(tag)
+    return json_response(TagResponse, tag)
 
 @router.delete("/{tag_id}")
-def delete_tag(tag_id: int, db: Session = Depends(get_db)):
+def delete_tag(
+    tag_id: int,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Delete a tag"""
-    success = tag_service.delete_tag(db, tag_id)
+    success = tag_service.delete_tag(db, tag_id, user_id=context.user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Tag not found")
     return {"message": "Tag deleted successfully"}
@@ -41,12 +60,12 @@ def delete_tag(tag_id: int, db: Session = Depends(get_db)):
 def get_suggestions(phrase: str):
     """Get rephrase suggestions for a phrase"""
     # Simplified suggestions - in production, could use AI
-    return Suggestion(
-        phrase=phrase,
-        alternatives=[
+    return json_response(Suggestion, {
+        "phrase": phrase,
+        "alternatives": [
             f"Simpler: {phrase}",
             f"Easier: {phrase}",
             f"Plain language: {phrase}"
         ],
-        position={"start": 0, "end": len(phrase)}
-    )
+        "position": {"start": 0, "end": len(phrase)}
+    })
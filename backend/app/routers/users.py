@@ -1,77 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 
+from ..config import settings
 from ..database import get_db
-from ..schemas.user import UserCreate, UserUpdate, UserResponse
+from ..schemas.user import UserCreate, UserUpdate, UserResponse, BulkRegisterResponse
 from ..schemas.preference import UserPreferenceUpdate, UserPreferenceResponse
 from ..services.user_service import user_service
+from ..utils.responses import json_response
+from ..utils.dependencies import RequestContext, get_request_context, get_current_user_id
+from ..utils.roster import parse_roster
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 @router.post("/register", response_model=UserResponse)
 def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user - creates user and stores profile data in preferences"""
-    # Create user
-    user = user_service.create_user(db, user_data)
-    
-    # If demographic data is provided, create initial preferences
-    if user_data.ageRange or user_data.gender or user_data.country:
-        from ..schemas.preference import UserPreferenceUpdate
-        other_prefs = {
-            'ageRange': user_data.ageRange,
-            'gender': user_data.gender,
-            'country': user_data.country,
-            'languagePreference': user_data.languagePreference,
-            'accessibilityNeeds': user_data.accessibilityNeeds or [],
-            'otherAccessibilityText': user_data.otherAccessibilityText,
-            'additionalSupport': user_data.additionalSupport,
-        }
-        
-        pref_data = UserPreferenceUpdate(
-            accessibility_need='none',
-            reading_level='intermediate',
-            preferred_complexity='moderate',
-            other_preferences=other_prefs
+    user = user_service.register_user(db, user_data)
+    return json_response(UserResponse, user)
+
+@router.post(
+    "/bulk-register",
+    response_model=BulkRegisterResponse,
+    dependencies=[Depends(get_current_user_id)]
+)
+async def bulk_register_users(request: Request, db: Session = Depends(get_db)):
+    """
+    Register a roster of users in one transaction.
+    Accepts text/csv, application/x-ndjson or a JSON array.
+    Requires an authenticated caller; body size and row count are capped.
+    """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Roster exceeds {settings.BULK_REGISTER_MAX_BYTES} bytes"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.BULK_REGISTER_MAX_BYTES:
+        raise too_large
+
+    # Spool the body to disk past 1 MB so large rosters are parsed from a file
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as body:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.BULK_REGISTER_MAX_BYTES:
+                raise too_large
+            body.write(chunk)
+        body.seek(0)
+
+        rows = parse_roster(
+            body,
+            request.headers.get("content-type", "application/json"),
+            max_rows=settings.BULK_REGISTER_MAX_ROWS
         )
-        user_service.update_preferences(db, user.id, pref_data)
-    
-    return UserResponse.model_validate(user)
+        try:
+            results = await run_in_threadpool(user_service.bulk_register, db, rows)
+        except ValueError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    created = sum(1 for result in results if result["status"] == "created")
+    return json_response(BulkRegisterResponse, {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    })
 
 @router.get("/profile/{user_id}", response_model=UserResponse)
-def get_profile(user_id: int, db: Session = Depends(get_db)):
+def get_profile(
+    user_id: int,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Get user profile"""
-    user = user_service.get_user_by_id(db, user_id)
+    user = context.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserResponse.model_validate(user)
+    return json_response(UserResponse, user)
 
 @router.put("/profile/{user_id}", response_model=UserResponse)
 def update_profile(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
 ):
     """Update user profile"""
+    context.authorize(user_id)
     user = user_service.update_user(db, user_id, user_data)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserResponse.model_validate(user)
+    return json_response(UserResponse, user)
 
 @router.get("/preferences/{user_id}", response_model=UserPreferenceResponse)
-def get_preferences(user_id: int, db: Session = Depends(get_db)):
+def get_preferences(
+    user_id: int,
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
+):
     """Get user preferences"""
+    context.authorize(user_id)
     preferences = user_service.get_preferences(db, user_id)
     if not preferences:
         raise HTTPException(status_code=404, detail="Preferences not found")
-    return UserPreferenceResponse.model_validate(preferences)
+    return json_response(UserPreferenceResponse, preferences)
 
 @router.put("/preferences/{user_id}", response_model=UserPreferenceResponse)
 def update_preferences(
     user_id: int,
     pref_data: UserPreferenceUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    context: RequestContext = Depends(get_request_context)
 ):
     """Update user preferences"""
+    context.authorize(user_id)
     preferences = user_service.update_preferences(db, user_id, pref_data)
-    return UserPreferenceResponse.model_validate(preferences)
+    return json_response(UserPreferenceResponse, preferences)
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Dict
+
+class DailyUsage(BaseModel):
+    day: date
+    rephrases: int
+    regenerates: int
+
+class UserUsage(BaseModel):
+    user_id: int
+    rephrases: int
+
+class AnalyticsResponse(BaseModel):
+    start: date
+    end: date
+    daily: List[DailyUsage]
+    rephrases: int
+    regenerates: int
+    regenerate_ratio: float
+    active_users: int
+    top_users: List[UserUsage]
+    rephrases_by_profile: Dict[str, int]
+    # Current totals, not limited to the requested range
+    tags_by_familiarity: Dict[str, int]
+    accessibility_needs: Dict[str, int]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 
 class Suggestion(BaseModel):
     phrase: str
@@ -30,3 +30,12 @@ class RephraseHistoryResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class RefinementMessage(BaseModel):
+    """Client message on a refinement session websocket"""
+    type: Literal['rephrase', 'regenerate', 'accept', 'ignore', 'edit']
+    text: Optional[str] = None
+    phrase: Optional[str] = Field(None, min_length=1)
+    replacement: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
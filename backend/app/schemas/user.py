@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -36,3 +36,15 @@ class UserLogin(BaseModel):
 class TokenResponse(BaseModel):
     user: UserResponse
     token: str
+
+class BulkRegisterResult(BaseModel):
+    row: int
+    status: str
+    id: Optional[int] = None
+    email: Optional[str] = None
+    detail: Optional[str] = None
+
+class BulkRegisterResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRegisterResult]
@@ -1,13 +1,24 @@
 from typing import Optional, List, Dict, Any
-import openai
 from ..config import settings
 
 class AIService:
     def __init__(self):
-        self.openai_client = None
-        if settings.OPENAI_API_KEY:
+        self._openai_client = None
+
+    @property
+    def openai_client(self):
+        """
+        The OpenAI SDK is imported on first use rather than at module import
+        """
+        if self._openai_client is None and settings.OPENAI_API_KEY:
+            import openai
             openai.api_key = settings.OPENAI_API_KEY
-            self.openai_client = openai
+            self._openai_client = openai
+        return self._openai_client
+
+    def warm_up(self) -> None:
+        """Initialize the provider client ahead of the first request"""
+        self.openai_client
 
     def rephrase_text(
         self,
@@ -0,0 +1,204 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any, Iterable
+from ..models.analytics import AnalyticsRollup
+from ..models.preference import UserPreference
+from ..models.rephrase import RephraseHistory
+from ..models.tag import Tag
+
+# Metrics counted per day within the requested range
+REPHRASES = "rephrases"
+REGENERATES = "regenerates"
+REPHRASES_BY_USER = "rephrases_by_user"
+REPHRASES_BY_PROFILE = "rephrases_by_profile"
+# Net daily changes, summed over all days to give current totals
+TAGS_BY_FAMILIARITY = "tags_by_familiarity"
+ACCESSIBILITY_NEEDS = "accessibility_needs"
+
+UNKNOWN = "unknown"
+# Rows per upsert statement, well under SQLite's bound parameter limit
+UPSERT_BATCH_SIZE = 500
+
+class AnalyticsService:
+    @staticmethod
+    def increment(db: Session, deltas: Dict[tuple, int], day: Optional[date] = None) -> None:
+        """
+        Add `deltas`, keyed by (metric, dimension), to the day's counters.
+        Runs inside the caller's transaction; the caller commits.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        day = day or datetime.utcnow().date()
+        rows = [
+            {"day": day, "metric": metric, "dimension": dimension, "value": delta}
+            for (metric, dimension), delta in deltas.items()
+        ]
+
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                stmt = insert(AnalyticsRollup).values(rows[start:start + UPSERT_BATCH_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["day", "metric", "dimension"],
+                    set_={"value": AnalyticsRollup.value + stmt.excluded.value}
+                )
+                db.execute(stmt)
+            return
+
+        for row in rows:
+            updated = db.query(AnalyticsRollup).filter(
+                AnalyticsRollup.day == row["day"],
+                AnalyticsRollup.metric == row["metric"],
+                AnalyticsRollup.dimension == row["dimension"]
+            ).update({AnalyticsRollup.value: AnalyticsRollup.value + row["value"]}, synchronize_session=False)
+            if not updated:
+                db.add(AnalyticsRollup(**row))
+
+    @staticmethod
+    def record_rephrase(
+        db: Session,
+        user_id: int,
+        accessibility_need: Optional[str],
+        regenerate: bool
+    ) -> None:
+        AnalyticsService.increment(db, {
+            (REPHRASES, ""): 1,
+            (REGENERATES, ""): 1 if regenerate else 0,
+            (REPHRASES_BY_USER, str(user_id)): 1,
+            (REPHRASES_BY_PROFILE, accessibility_need or UNKNOWN): 1,
+        })
+
+    @staticmethod
+    def record_tag_levels(db: Session, removed: Iterable[Optional[str]], added: Iterable[Optional[str]]) -> None:
+        deltas = Counter()
+        for level in removed:
+            deltas[(TAGS_BY_FAMILIARITY, level or UNKNOWN)] -= 1
+        for level in added:
+            deltas[(TAGS_BY_FAMILIARITY, level or UNKNOWN)] += 1
+        AnalyticsService.increment(db, deltas)
+
+    @staticmethod
+    def accessibility_needs(pref: Optional[UserPreference]) -> List[str]:
+        """The needs a user picked at registration, else their profile's need"""
+        if not pref:
+            return []
+        needs = (pref.other_preferences or {}).get("accessibilityNeeds") or []
+        if needs:
+            return [str(need) for need in needs]
+        return [pref.accessibility_need] if pref.accessibility_need else []
+
+    @staticmethod
+    def record_accessibility_needs(db: Session, removed: Iterable[str], added: Iterable[str]) -> None:
+        deltas = Counter()
+        for need in removed:
+            deltas[(ACCESSIBILITY_NEEDS, need)] -= 1
+        for need in added:
+            deltas[(ACCESSIBILITY_NEEDS, need)] += 1
+        AnalyticsService.increment(db, deltas)
+
+    @staticmethod
+    def get_summary(db: Session, start: date, end: date, top: int = 10) -> Dict[str, Any]:
+        """
+        Build the analytics report from the rollup table alone. Per-user
+        activity is limited to the `top` most active users.
+        """
+        ranged = db.query(
+            AnalyticsRollup.day, AnalyticsRollup.metric, AnalyticsRollup.dimension, AnalyticsRollup.value
+        ).filter(
+            AnalyticsRollup.day >= start,
+            AnalyticsRollup.day <= end,
+            AnalyticsRollup.metric.in_([REPHRASES, REGENERATES, REPHRASES_BY_PROFILE])
+        ).all()
+
+        user_total = func.sum(AnalyticsRollup.value)
+        per_user = db.query(AnalyticsRollup.dimension, user_total.label("rephrases")).filter(
+            AnalyticsRollup.day >= start,
+            AnalyticsRollup.day <= end,
+            AnalyticsRollup.metric == REPHRASES_BY_USER
+        ).group_by(AnalyticsRollup.dimension)
+        top_users = per_user.order_by(user_total.desc(), AnalyticsRollup.dimension).limit(top).all()
+        active_users = per_user.count()
+
+        totals = db.query(
+            AnalyticsRollup.metric, AnalyticsRollup.dimension, func.sum(AnalyticsRollup.value)
+        ).filter(
+            AnalyticsRollup.metric.in_([TAGS_BY_FAMILIARITY, ACCESSIBILITY_NEEDS])
+        ).group_by(AnalyticsRollup.metric, AnalyticsRollup.dimension).all()
+
+        daily = defaultdict(lambda: {REPHRASES: 0, REGENERATES: 0})
+        by_profile = Counter()
+        for day, metric, dimension, value in ranged:
+            if metric == REPHRASES_BY_PROFILE:
+                by_profile[dimension] += value
+            else:
+                daily[day][metric] += value
+
+        current = {TAGS_BY_FAMILIARITY: {}, ACCESSIBILITY_NEEDS: {}}
+        for metric, dimension, value in totals:
+            if value:
+                current[metric][dimension] = int(value)
+
+        rephrases = sum(counts[REPHRASES] for counts in daily.values())
+        regenerates = sum(counts[REGENERATES] for counts in daily.values())
+        return {
+            "start": start,
+            "end": end,
+            "daily": [{"day": day, **daily[day]} for day in sorted(daily)],
+            "rephrases": rephrases,
+            "regenerates": regenerates,
+            "regenerate_ratio": regenerates / rephrases if rephrases else 0.0,
+            "active_users": active_users,
+            "top_users": [
+                {"user_id": int(user_id), "rephrases": int(rephrases)}
+                for user_id, rephrases in top_users
+            ],
+            "rephrases_by_profile": dict(by_profile),
+            "tags_by_familiarity": current[TAGS_BY_FAMILIARITY],
+            "accessibility_needs": current[ACCESSIBILITY_NEEDS],
+        }
+
+    @staticmethod
+    def rebuild(db: Session, batch_size: int = 1000) -> None:
+        """
+        Recompute all rollups from the primary tables, for first deployment
+        or after a drift. Rows already archived out of `rephrase_history`
+        are not counted.
+        """
+        db.query(AnalyticsRollup).delete(synchronize_session=False)
+        today = datetime.utcnow().date()
+
+        profiles = {}
+        needs = Counter()
+        for pref in db.query(UserPreference).yield_per(batch_size):
+            profiles[pref.user_id] = pref.accessibility_need
+            for need in AnalyticsService.accessibility_needs(pref):
+                needs[(ACCESSIBILITY_NEEDS, need)] += 1
+
+        by_day = defaultdict(Counter)
+        for user_id, version, created_at in db.query(
+            RephraseHistory.user_id, RephraseHistory.version, RephraseHistory.created_at
+        ).yield_per(batch_size):
+            counts = by_day[created_at.date() if created_at else today]
+            counts[(REPHRASES, "")] += 1
+            counts[(REGENERATES, "")] += 1 if (version or 1) > 1 else 0
+            counts[(REPHRASES_BY_USER, str(user_id))] += 1
+            counts[(REPHRASES_BY_PROFILE, profiles.get(user_id) or UNKNOWN)] += 1
+
+        for level, created_at in db.query(Tag.familiarity_level, Tag.created_at).yield_per(batch_size):
+            by_day[created_at.date() if created_at else today][(TAGS_BY_FAMILIARITY, level or UNKNOWN)] += 1
+
+        # Preferences carry no timestamp, so their distribution lands on today
+        by_day[today].update(needs)
+
+        for day, deltas in by_day.items():
+            AnalyticsService.increment(db, deltas, day=day)
+        db.commit()
+
+analytics_service = AnalyticsService()
@@ -0,0 +1,91 @@
+import gzip
+import os
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from typing import Iterator
+from ..database import SessionLocal
+from ..models.rephrase import RephraseHistory
+from ..schemas.rephrase import RephraseHistoryResponse
+
+EXPORT_BATCH_SIZE = 500
+ARCHIVE_BATCH_SIZE = 1000
+
+class HistoryService:
+    @staticmethod
+    def export_jsonl_gz(user_id: int) -> Iterator[bytes]:
+        """
+        Yield a user's full history as gzip-compressed JSON lines.
+
+        Rows are read through a server-side cursor in batches, so memory use
+        does not grow with the size of the history. The generator owns its
+        session because it outlives the request's dependencies.
+        """
+        compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+        db = SessionLocal()
+        try:
+            rows = db.query(RephraseHistory).filter(
+                RephraseHistory.user_id == user_id
+            ).order_by(RephraseHistory.id).execution_options(
+                stream_results=True
+            ).yield_per(EXPORT_BATCH_SIZE)
+
+            for row in rows:
+                line = RephraseHistoryResponse.model_validate(row).model_dump_json() + "\n"
+                chunk = compressor.compress(line.encode())
+                if chunk:
+                    yield chunk
+            yield compressor.flush()
+        finally:
+            db.close()
+
+    @staticmethod
+    def archive_older_than(
+        db: Session,
+        days: int,
+        archive_dir: str,
+        batch_size: int = ARCHIVE_BATCH_SIZE
+    ) -> int:
+        """
+        Move rows older than `days` into a gzip JSONL file under `archive_dir`.
+
+        Each batch is written and synced to the archive before it is deleted
+        in its own transaction, so an interrupted run never loses rows; at
+        worst a batch appears in the archive twice.
+        """
+        if days < 0:
+            raise ValueError("days must not be negative")
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(
+            archive_dir,
+            f"rephrase_history_{datetime.utcnow():%Y%m%dT%H%M%S}.jsonl.gz"
+        )
+
+        archived = 0
+        while True:
+            batch = db.query(RephraseHistory).filter(
+                RephraseHistory.created_at < cutoff
+            ).order_by(RephraseHistory.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            # Each batch is appended as its own gzip member
+            with open(path, "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+                    for row in batch:
+                        line = RephraseHistoryResponse.model_validate(row).model_dump_json() + "\n"
+                        archive.write(line.encode())
+                raw.flush()
+                os.fsync(raw.fileno())
+
+            db.query(RephraseHistory).filter(
+                RephraseHistory.id.in_([row.id for row in batch])
+            ).delete(synchronize_session=False)
+            db.commit()
+            db.expunge_all()
+            archived += len(batch)
+
+        return archived
+
+history_service = HistoryService()
@@ -0,0 +1,195 @@
+from difflib import SequenceMatcher
+from typing import Optional, List, Dict, Any
+from ..database import SessionLocal
+from ..models.rephrase import RephraseHistory
+from .ai_service import ai_service
+from .user_service import user_service
+from .tag_service import tag_service
+from .analytics_service import analytics_service
+
+def diff_spans(old: str, new: str) -> List[Dict[str, Any]]:
+    """
+    Return the spans of `old` that must be replaced to obtain `new`.
+    Offsets refer to `old`, so clients apply them from last to first.
+    """
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    return [
+        {"start": i1, "end": i2, "text": new[j1:j2]}
+        for op, i1, i2, j1, j2 in matcher.get_opcodes()
+        if op != "equal"
+    ]
+
+class RefinementSession:
+    """
+    Server-side state for one accept/ignore/regenerate loop.
+
+    The user, preferences and tags are loaded once when the session opens,
+    and the version counter is kept in memory instead of being recounted
+    on every regenerate. No database session is held between messages;
+    each rephrase opens and closes its own.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        accessibility_need: Optional[str],
+        reading_level: Optional[str],
+        preferred_complexity: Optional[str],
+        tagged_phrases: List[Dict[str, str]]
+    ):
+        self.user_id = user_id
+        self.accessibility_need = accessibility_need
+        self.reading_level = reading_level
+        self.preferred_complexity = preferred_complexity
+        self.tagged_phrases = tagged_phrases
+        self.text = ""
+        self.rephrased_text = ""
+        self.suggestions: List[Dict[str, Any]] = []
+        self.version = 0
+        self._versioned_text: Optional[str] = None
+
+    def set_text(self, text: str) -> None:
+        self.text = text
+
+    def rephrase(self, regenerate: bool = False) -> Dict[str, Any]:
+        """
+        Rephrase the current document and return the changed spans.
+        Like the REST endpoints, a plain rephrase stores version 1 and the
+        first regenerate of a text stores the count of its stored versions
+        plus one; later regenerates increment in memory.
+        """
+        db = SessionLocal()
+        try:
+            if not regenerate:
+                self.version = 1
+                # Force the next regenerate to count what history holds
+                self._versioned_text = None
+            elif self._versioned_text != self.text:
+                # Only count stored versions when the document itself changes
+                self.version = db.query(RephraseHistory).filter(
+                    RephraseHistory.user_id == self.user_id,
+                    RephraseHistory.original_text == self.text
+                ).count() + 1
+                self._versioned_text = self.text
+            else:
+                self.version += 1
+
+            result = ai_service.rephrase_text(
+                text=self.text,
+                accessibility_need=self.accessibility_need,
+                reading_level=self.reading_level,
+                preferred_complexity=self.preferred_complexity,
+                tagged_phrases=self.tagged_phrases
+            )
+
+            db.add(RephraseHistory(
+                user_id=self.user_id,
+                original_text=self.text,
+                rephrased_text=result["rephrased_text"],
+                version=self.version
+            ))
+            analytics_service.record_rephrase(db, self.user_id, self.accessibility_need, regenerate)
+            db.commit()
+        finally:
+            db.close()
+
+        changes = diff_spans(self.rephrased_text, result["rephrased_text"])
+        self.rephrased_text = result["rephrased_text"]
+        self.suggestions = result["suggestions"]
+
+        return {
+            "type": "rephrased",
+            "version": self.version,
+            "changes": changes,
+            "suggestions": self.suggestions
+        }
+
+    def accept(self, phrase: str, replacement: str) -> Dict[str, Any]:
+        """Replace a suggested phrase in the document"""
+        suggestion = self._find_suggestion(phrase)
+        if suggestion:
+            start = suggestion["position"]["start"]
+        else:
+            start = self.text.find(phrase)
+        if start < 0:
+            return self._patch([], [])
+        return self.edit(start, start + len(phrase), replacement, removed=[phrase])
+
+    def ignore(self, phrase: str) -> Dict[str, Any]:
+        """Drop a suggestion without touching the document"""
+        suggestion = self._find_suggestion(phrase)
+        if not suggestion:
+            return self._patch([], [])
+        self.suggestions.remove(suggestion)
+        return self._patch([], [phrase])
+
+    def edit(
+        self,
+        start: int,
+        end: int,
+        text: str,
+        removed: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Replace `[start, end)` of the document, shifting later suggestions"""
+        start = max(0, min(start, len(self.text)))
+        end = max(start, min(end, len(self.text)))
+        removed = list(removed or [])
+        shift = len(text) - (end - start)
+
+        kept = []
+        for suggestion in self.suggestions:
+            position = suggestion["position"]
+            if suggestion["phrase"] in removed:
+                continue
+            if position["end"] <= start:
+                kept.append(suggestion)
+            elif position["start"] >= end:
+                position["start"] += shift
+                position["end"] += shift
+                kept.append(suggestion)
+            else:
+                # Overlaps the edited range, so its span is no longer valid
+                removed.append(suggestion["phrase"])
+        self.suggestions = kept
+
+        self.text = self.text[:start] + text + self.text[end:]
+        return self._patch([{"start": start, "end": end, "text": text}], removed)
+
+    def _find_suggestion(self, phrase: str) -> Optional[Dict[str, Any]]:
+        for suggestion in self.suggestions:
+            if suggestion["phrase"] == phrase:
+                return suggestion
+        return None
+
+    def _patch(self, changes: List[Dict[str, Any]], removed: List[str]) -> Dict[str, Any]:
+        return {
+            "type": "patch",
+            "changes": changes,
+            "removed_suggestions": removed
+        }
+
+class RefinementService:
+    @staticmethod
+    def open_session(user_id: int) -> Optional[RefinementSession]:
+        """Load the user's context with a short-lived database session"""
+        db = SessionLocal()
+        try:
+            if not user_service.get_user_by_id(db, user_id):
+                return None
+            preferences = user_service.get_preferences(db, user_id)
+            tags = tag_service.get_tags_by_user(db, user_id)
+        finally:
+            db.close()
+
+        return RefinementSession(
+            user_id=user_id,
+            accessibility_need=preferences.accessibility_need if preferences else None,
+            reading_level=preferences.reading_level if preferences else None,
+            preferred_complexity=preferences.preferred_complexity if preferences else None,
+            tagged_phrases=[
+                {"phrase": tag.phrase, "level": tag.familiarity_level}
+                for tag in tags
+            ]
+        )
+
+refinement_service = RefinementService()
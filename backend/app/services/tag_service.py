@@ -1,13 +1,16 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Iterator
+from ..database import SessionLocal
 from ..models.tag import Tag
 from ..schemas.tag import TagCreate, TagUpdate
+from .analytics_service import analytics_service
 
 class TagService:
     @staticmethod
     def create_tag(db: Session, tag_data: TagCreate) -> Tag:
         db_tag = Tag(**tag_data.model_dump())
         db.add(db_tag)
+        analytics_service.record_tag_levels(db, removed=[], added=[db_tag.familiarity_level])
         db.commit()
         db.refresh(db_tag)
         return db_tag
@@ -16,31 +19,58 @@ class TagService:
     def get_tags_by_user(db: Session, user_id: int) -> List[Tag]:
         return db.query(Tag).filter(Tag.user_id == user_id).all()
 
+    @staticmethod
+    def iter_tags_by_user(user_id: int, batch_size: int = 500) -> Iterator[Tag]:
+        """
+        Yield a user's tags in batches. The generator owns its session
+        because it is consumed while the response streams.
+        """
+        db = SessionLocal()
+        try:
+            yield from db.query(Tag).filter(Tag.user_id == user_id).order_by(Tag.id).yield_per(batch_size)
+        finally:
+            db.close()
+
     @staticmethod
     def get_tag_by_id(db: Session, tag_id: int) -> Optional[Tag]:
         return db.query(Tag).filter(Tag.id == tag_id).first()
 
     @staticmethod
-    def update_tag(db: Session, tag_id: int, tag_data: TagUpdate) -> Optional[Tag]:
-        tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    def update_tag(
+        db: Session,
+        tag_id: int,
+        tag_data: TagUpdate,
+        user_id: Optional[int] = None
+    ) -> Optional[Tag]:
+        query = db.query(Tag).filter(Tag.id == tag_id)
+        if user_id is not None:
+            query = query.filter(Tag.user_id == user_id)
+        tag = query.first()
         if not tag:
             return None
         
+        old_level = tag.familiarity_level
         update_data = tag_data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(tag, key, value)
+        if tag.familiarity_level != old_level:
+            analytics_service.record_tag_levels(db, removed=[old_level], added=[tag.familiarity_level])
         
         db.commit()
         db.refresh(tag)
         return tag
 
     @staticmethod
-    def delete_tag(db: Session, tag_id: int) -> bool:
-        tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    def delete_tag(db: Session, tag_id: int, user_id: Optional[int] = None) -> bool:
+        query = db.query(Tag).filter(Tag.id == tag_id)
+        if user_id is not None:
+            query = query.filter(Tag.user_id == user_id)
+        tag = query.first()
         if not tag:
             return False
         
         db.delete(tag)
+        analytics_service.record_tag_levels(db, removed=[tag.familiarity_level], added=[])
         db.commit()
         return True
 
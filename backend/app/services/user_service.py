@@ -1,24 +1,145 @@
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Iterable
 from ..models.user import User
 from ..models.preference import UserPreference
 from ..schemas.user import UserCreate, UserUpdate
 from ..schemas.preference import UserPreferenceCreate, UserPreferenceUpdate
-import datetime
+from .analytics_service import analytics_service
+import uuid
+
+BULK_BATCH_SIZE = 500
+
+def generate_email() -> str:
+    """Placeholder email for users registered without one"""
+    return f"user_{uuid.uuid4().hex}@senseable.app"
 
 class UserService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
-        # Generate email if not provided
-        timestamp = int(datetime.datetime.now().timestamp() * 1000)
-        email = user_data.email or f"user_{timestamp}@senseable.app"
-        
-        db_user = User(email=email, name=user_data.name)
+    def initial_preferences(user_id: int, user_data: UserCreate) -> Optional[UserPreference]:
+        """Preferences seeded from registration profile data, if any was given"""
+        if not (user_data.ageRange or user_data.gender or user_data.country):
+            return None
+        return UserPreference(
+            user_id=user_id,
+            accessibility_need='none',
+            reading_level='intermediate',
+            preferred_complexity='moderate',
+            other_preferences={
+                'ageRange': user_data.ageRange,
+                'gender': user_data.gender,
+                'country': user_data.country,
+                'languagePreference': user_data.languagePreference,
+                'accessibilityNeeds': user_data.accessibilityNeeds or [],
+                'otherAccessibilityText': user_data.otherAccessibilityText,
+                'additionalSupport': user_data.additionalSupport,
+            }
+        )
+
+    @staticmethod
+    def register_user(db: Session, user_data: UserCreate) -> User:
+        """Create a user and their initial preferences in one transaction"""
+        db_user = User(email=user_data.email or generate_email(), name=user_data.name)
         db.add(db_user)
+        db.flush()
+
+        pref = UserService.initial_preferences(db_user.id, user_data)
+        if pref:
+            db.add(pref)
+            analytics_service.record_accessibility_needs(
+                db, removed=[], added=analytics_service.accessibility_needs(pref)
+            )
+
         db.commit()
         db.refresh(db_user)
         return db_user
 
+    @staticmethod
+    def bulk_register(
+        db: Session,
+        rows: Iterable[Dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE
+    ) -> List[Dict[str, Any]]:
+        """
+        Register many users in a single transaction.
+
+        Rows are consumed lazily and inserted in batches. Invalid rows and
+        duplicate emails are reported per row without aborting the rest.
+        """
+        results = []
+        seen_emails = set()
+        batch = []
+
+        for row_number, row in enumerate(rows, start=1):
+            try:
+                user_data = UserCreate.model_validate(row)
+            except ValidationError as e:
+                results.append({
+                    "row": row_number,
+                    "status": "error",
+                    "detail": "; ".join(
+                        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                        for err in e.errors()
+                    )
+                })
+                continue
+
+            email = user_data.email or generate_email()
+            if email in seen_emails:
+                results.append({"row": row_number, "status": "error", "email": email, "detail": "Duplicate email in roster"})
+                continue
+            seen_emails.add(email)
+
+            batch.append((row_number, user_data, email))
+            if len(batch) >= batch_size:
+                results.extend(UserService._insert_batch(db, batch))
+                batch = []
+
+        if batch:
+            results.extend(UserService._insert_batch(db, batch))
+
+        db.commit()
+        results.sort(key=lambda result: result["row"])
+        return results
+
+    @staticmethod
+    def _insert_batch(db: Session, batch: List[tuple]) -> List[Dict[str, Any]]:
+        existing = {
+            email for (email,) in db.query(User.email).filter(
+                User.email.in_([email for _, _, email in batch])
+            )
+        }
+
+        results = []
+        new_users = []
+        for row_number, user_data, email in batch:
+            if email in existing:
+                results.append({"row": row_number, "status": "error", "email": email, "detail": "Email already registered"})
+                continue
+            new_users.append((row_number, user_data, User(email=email, name=user_data.name)))
+
+        db.add_all([user for _, _, user in new_users])
+        db.flush()
+
+        prefs = [
+            UserService.initial_preferences(user.id, user_data)
+            for _, user_data, user in new_users
+        ]
+        prefs = [pref for pref in prefs if pref]
+        db.add_all(prefs)
+        analytics_service.record_accessibility_needs(
+            db,
+            removed=[],
+            added=[need for pref in prefs for need in analytics_service.accessibility_needs(pref)]
+        )
+        db.flush()
+
+        results.extend(
+            {"row": row_number, "status": "created", "id": user.id, "email": user.email}
+            for row_number, _, user in new_users
+        )
+        return results
+
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
@@ -49,6 +170,9 @@ class UserService:
     def create_preferences(db: Session, pref_data: UserPreferenceCreate) -> UserPreference:
         db_pref = UserPreference(**pref_data.model_dump())
         db.add(db_pref)
+        analytics_service.record_accessibility_needs(
+            db, removed=[], added=analytics_service.accessibility_needs(db_pref)
+        )
         db.commit()
         db.refresh(db_pref)
         return db_pref
@@ -60,6 +184,7 @@ class UserService:
         pref_data: UserPreferenceUpdate
     ) -> Optional[UserPreference]:
         pref = db.query(UserPreference).filter(UserPreference.user_id == user_id).first()
+        old_needs = analytics_service.accessibility_needs(pref)
         
         if not pref:
             # Create new preferences if they don't exist
@@ -74,6 +199,9 @@ class UserService:
                 if key != 'user_id':
                     setattr(pref, key, value)
         
+        analytics_service.record_accessibility_needs(
+            db, removed=old_needs, added=analytics_service.accessibility_needs(pref)
+        )
         db.commit()
         db.refresh(pref)
         return pref
@@ -0,0 +1,33 @@
+"""
+Issue a bearer token for an existing user.
+
+The API does not issue tokens itself; operators mint them for the callers
+of token-protected endpoints (bulk registration, analytics, history export):
+
+    python -m app.token <user_id>
+"""
+import argparse
+import sys
+from .database import SessionLocal
+from .services.user_service import user_service
+from .utils.auth import create_access_token
+from .config import settings
+
+def main():
+    parser = argparse.ArgumentParser(description="Issue a bearer token for an existing user")
+    parser.add_argument("user_id", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = user_service.get_user_by_id(db, args.user_id)
+    finally:
+        db.close()
+    if not user:
+        parser.error(f"user {args.user_id} not found")
+
+    print(create_access_token({"sub": str(user.id)}))
+    print(f"Valid for {settings.JWT_EXPIRATION_MINUTES} minutes", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
 from jose import JWTError, jwt
 from ..config import settings
 
+# Verified claims keyed by raw token, kept until the token's `exp`
+TOKEN_CACHE_SIZE = 10000
+_token_cache: "OrderedDict[str, dict]" = OrderedDict()
+_token_cache_lock = Lock()
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRATION_MINUTES)
@@ -9,9 +18,29 @@ def create_access_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> dict:
+def verify_token(token: str) -> Optional[dict]:
+    """
+    Decode and verify a JWT. The signature is checked once per token;
+    later calls are served from the cache until the token expires.
+    """
+    now = time.time()
+    with _token_cache_lock:
+        payload = _token_cache.get(token)
+        if payload is not None:
+            if payload["exp"] > now:
+                return payload
+            del _token_cache[token]
+            return None
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    # Tokens without an expiry are verified every time rather than cached forever
+    if isinstance(payload.get("exp"), (int, float)):
+        with _token_cache_lock:
+            _token_cache[token] = payload
+            if len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return payload
@@ -1,22 +1,49 @@
-from fastapi import Header, HTTPException
-from ..utils.auth import verify_token
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.requests import HTTPConnection
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.user import User
+from ..services.user_service import user_service
 
-def get_current_user_id(authorization: str = Header(None)) -> int:
-    """Extract user ID from JWT token in Authorization header"""
-    if not authorization:
+class RequestContext:
+    """
+    Caller identity for one request, filled in by `AuthContextMiddleware`.
+    The user row is loaded at most once and reused by later lookups.
+    """
+
+    def __init__(self, user_id: Optional[int]):
+        self.user_id = user_id
+        self._user: Optional[User] = None
+
+    def authorize(self, user_id: int) -> None:
+        """Reject access to another user's data when the request carries a token"""
+        if self.user_id is not None and self.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not allowed to access this user")
+
+    def get_user(self, db: Session, user_id: int) -> Optional[User]:
+        self.authorize(user_id)
+        if self._user is None or self._user.id != user_id:
+            self._user = user_service.get_user_by_id(db, user_id)
+        return self._user
+
+def get_request_context(connection: HTTPConnection) -> RequestContext:
+    context = getattr(connection.state, "context", None)
+    if context is None:
+        context = RequestContext(getattr(connection.state, "user_id", None))
+        connection.state.context = context
+    return context
+
+def get_current_user_id(connection: HTTPConnection) -> int:
+    """Return the user ID from the verified bearer token"""
+    user_id = get_request_context(connection).user_id
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Authorization header missing")
-    
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-    
-    token = authorization.replace("Bearer ", "")
-    payload = verify_token(token)
-    
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token payload")
-    
-    return int(user_id)
+    return user_id
+
+def get_admin_user_id(connection: HTTPConnection) -> int:
+    """Return the caller's user ID if it is listed in ADMIN_USER_IDS"""
+    user_id = get_current_user_id(connection)
+    if user_id not in settings.ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
@@ -0,0 +1,64 @@
+import json
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .auth import verify_token
+
+class AuthContextMiddleware:
+    """
+    Verify the bearer token once per request and store the caller's user id
+    in the request state, where `get_request_context` picks it up.
+
+    Requests without an Authorization header pass through anonymously.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+
+        user_id = None
+        if authorization is not None:
+            user_id = self._authenticate(authorization)
+            if user_id is None:
+                await self._reject(scope, send)
+                return
+
+        scope.setdefault("state", {})["user_id"] = user_id
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _authenticate(authorization: str):
+        if not authorization.startswith("Bearer "):
+            return None
+        payload = verify_token(authorization[len("Bearer "):])
+        if not payload or not payload.get("sub"):
+            return None
+        try:
+            return int(payload["sub"])
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    async def _reject(scope: Scope, send: Send):
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        body = json.dumps({"detail": "Invalid or expired token"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"www-authenticate", b"Bearer"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,49 @@
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Sequence, Type
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+STREAM_CHUNK_SIZE = 100
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+def json_response(schema: Type[BaseModel], obj: Any) -> Response:
+    """
+    Validate `obj` once and serialize it straight to JSON bytes.
+    Returning a Response skips FastAPI's second pass over `response_model`.
+    """
+    if not isinstance(obj, schema):
+        obj = schema.model_validate(obj)
+    return Response(content=obj.model_dump_json(), media_type="application/json")
+
+def json_list_response(schema: Type[BaseModel], objs: Sequence[Any]) -> Response:
+    """Validate each row once and serialize the list in one pass"""
+    adapter = _list_adapter(schema)
+    items = adapter.validate_python(objs, from_attributes=True)
+    return Response(content=adapter.dump_json(items), media_type="application/json")
+
+def json_stream_response(schema: Type[BaseModel], rows: Iterable[Any]) -> StreamingResponse:
+    """
+    Stream a JSON array from a lazy row iterator, validating and serializing
+    STREAM_CHUNK_SIZE rows at a time.
+    """
+    return StreamingResponse(_stream_list(_list_adapter(schema), rows), media_type="application/json")
+
+def _stream_list(adapter: TypeAdapter, rows: Iterable[Any]) -> Iterator[bytes]:
+    rows = iter(rows)
+    yield b"["
+    first = True
+    while True:
+        chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+        if not chunk:
+            break
+        if not first:
+            yield b","
+        # Each chunk serializes as "[...]", so drop its brackets
+        yield adapter.dump_json(adapter.validate_python(chunk, from_attributes=True))[1:-1]
+        first = False
+    yield b"]"
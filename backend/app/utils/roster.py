@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+# CSV columns holding lists, written as "a;b;c"
+LIST_COLUMNS = {"accessibilityNeeds"}
+JSON_CHUNK_SIZE = 64 * 1024
+
+def parse_roster(
+    body: BinaryIO,
+    content_type: str,
+    max_rows: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one dict per user from a CSV, JSON Lines or JSON array roster.
+
+    All formats are parsed incrementally. Raises ValueError on malformed
+    input or when the roster has more than `max_rows` rows.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    text = io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+
+    if media_type == "text/csv":
+        rows = _parse_csv(text)
+    elif media_type in ("application/x-ndjson", "application/jsonl"):
+        rows = _parse_json_lines(text)
+    elif media_type == "application/json":
+        rows = iter(_JsonArrayReader(text))
+    else:
+        raise ValueError(f"Unsupported roster type: {media_type}")
+
+    for row_number, row in enumerate(rows, start=1):
+        if max_rows is not None and row_number > max_rows:
+            raise ValueError(f"Roster exceeds {max_rows} rows")
+        yield row
+
+def _parse_csv(text: io.TextIOBase) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(text):
+        parsed = {}
+        for key, value in row.items():
+            if key is None:
+                continue
+            value = (value or "").strip()
+            if not value:
+                continue
+            if key in LIST_COLUMNS:
+                parsed[key] = [item.strip() for item in value.split(";") if item.strip()]
+            else:
+                parsed[key] = value
+        yield parsed
+
+def _parse_json_lines(text: io.TextIOBase) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+class _JsonArrayReader:
+    """Yield the elements of a top-level JSON array, reading in chunks"""
+
+    def __init__(self, text: io.TextIOBase):
+        self.text = text
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._peek() != "[":
+            raise ValueError("Expected a JSON array of users")
+        self.pos += 1
+        if self._peek() == "]":
+            self.pos += 1
+        else:
+            while True:
+                yield self._decode_value()
+                token = self._peek()
+                self.pos += 1
+                if token == "]":
+                    break
+                if token != ",":
+                    raise ValueError("Invalid JSON: expected ',' or ']' between users")
+        if self._peek():
+            raise ValueError("Invalid JSON: unexpected data after the array")
+
+    def _read_more(self) -> None:
+        chunk = self.text.read(JSON_CHUNK_SIZE)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at the end"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ""
+            self._read_more()
+
+    def _decode_value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"Invalid JSON: {e}")
+                # The element may continue in the next chunk
+                self._read_more()
+                continue
+            if end == len(self.buffer) and not self.eof:
+                # A trailing number may be cut off at the chunk boundary
+                self._read_more()
+                continue
+            self.pos = end
+            return value
@@ -50,3 +50,14 @@ CREATE TABLE IF NOT EXISTS rephrase_history (
 );
 
 CREATE INDEX IF NOT EXISTS idx_rephrase_history_user_id ON rephrase_history(user_id);
+CREATE INDEX IF NOT EXISTS idx_rephrase_history_created_at ON rephrase_history(created_at);
+
+-- Analytics rollups table (per-day counters maintained on write)
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day DATE NOT NULL,
+    metric VARCHAR(50) NOT NULL,
+    dimension VARCHAR(255) NOT NULL DEFAULT '',
+    value INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_analytics_rollups_day_metric_dimension UNIQUE (day, metric, dimension)
+);
@@ -0,0 +1,56 @@
+"""
+Measure cold-start import cost of the API.
+
+Each run imports `app.main` in a fresh interpreter, so nothing is cached
+between runs. Usage, from the backend directory:
+
+    python scripts/benchmark_startup.py [--runs 10] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def time_import(module: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - start
+
+def slowest_imports(module: str, top: int) -> list:
+    """Parse `-X importtime` output into (cumulative_us, module) pairs"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # Baseline interpreter start-up, subtracted from the import timings
+    baseline = statistics.median(time_import("sys") for _ in range(args.runs))
+    timings = [time_import(args.module) - baseline for _ in range(args.runs)]
+
+    print(f"import {args.module}: median {statistics.median(timings) * 1000:.1f} ms, "
+          f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms "
+          f"over {args.runs} runs")
+    print("\nSlowest imports (cumulative):")
+    for cumulative, name in slowest_imports(args.module, args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()